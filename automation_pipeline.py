@@ -15,15 +15,17 @@ from data_ingestion import load_data, preprocess_data
 from feature_engineering import create_temporal_features, create_lag_features, create_rolling_features
 from model_training import train_arima_model, train_lstm_model
 from prediction_and_visualization import predict_with_arima, predict_with_lstm, visualize_predictions
+from prediction_store import save_predictions
 
-def automated_pipeline(raw_data_path, output_predictions_path):
+def automated_pipeline(raw_data_path, output_predictions_path, sensor_id="default"):
     """
     Automates the entire pipeline: data ingestion, preprocessing, feature engineering,
     model training, predictions, and visualization.
     
     Parameters:
         raw_data_path (str): Path to the raw traffic data file.
-        output_predictions_path (str): Path to save the predictions.
+        output_predictions_path (str): Path to the SQLite prediction store.
+        sensor_id (str): Identifier of the sensor the raw data comes from.
     """
     # Step 1: Load and preprocess data
     print("Step 1: Loading and preprocessing data...")
@@ -61,12 +63,12 @@ def automated_pipeline(raw_data_path, output_predictions_path):
         "ARIMA_Predictions": arima_predictions,
         "LSTM_Predictions": lstm_predictions
     })
-    predictions_df.to_csv(output_predictions_path, index=False)
-    print(f"Predictions saved to {output_predictions_path}")
+    written = save_predictions(predictions_df, output_predictions_path, sensor_id=sensor_id)
+    print(f"{written} predictions appended to {output_predictions_path}")
 
 # Example usage
 if __name__ == "__main__":
     raw_data_path = "/path/to/raw_traffic_data.csv"  # Replace with actual path, e.g., "satej/data/raw_traffic.csv"
-    output_predictions_path = "/path/to/predictions.csv"  # Replace with actual path, e.g., "satej/data/predictions.csv"
+    output_predictions_path = "/path/to/predictions.db"  # Replace with actual path, e.g., "satej/data/predictions.db"
     
     automated_pipeline(raw_data_path, output_predictions_path)
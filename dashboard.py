@@ -12,25 +12,27 @@ import dash
 from dash import dcc, html
 from dash.dependencies import Input, Output
 
-def load_predictions(file_path):
+from prediction_store import load_predictions as query_predictions, to_wide_format
+
+def load_predictions(file_path, sensor_id="default"):
     """
-    Load prediction data from a CSV file.
+    Load the predictions of the most recent run for a sensor from the prediction store.
     
     Parameters:
-        file_path (str): Path to the CSV file containing predictions.
+        file_path (str): Path to the SQLite prediction store.
+        sensor_id (str): Identifier of the sensor to display.
     
     Returns:
-        pd.DataFrame: DataFrame with prediction data.
+        pd.DataFrame: DataFrame with a 'Timestamp' column and one column per model.
     """
     try:
-        data = pd.read_csv(file_path)
-        data['Timestamp'] = pd.to_datetime(data['Timestamp'])
-        return data
+        data = query_predictions(file_path, sensor_id=sensor_id, latest_run_only=True)
+        return to_wide_format(data)
     except Exception as e:
         raise RuntimeError(f"Failed to load predictions: {str(e)}")
 
 # Load prediction data
-predictions_path = "/path/to/predictions.csv"  # Replace with actual path, e.g., "satej/data/predictions.csv"
+predictions_path = "/path/to/predictions.db"  # Replace with actual path, e.g., "satej/data/predictions.db"
 predictions_data = load_predictions(predictions_path)
 
 # Initialize Dash app
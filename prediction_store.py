@@ -0,0 +1,275 @@
+"""
+prediction_store.py
+--------------------
+This module persists traffic flow predictions to a local SQLite store.
+Each pipeline run appends its forecasts in a single transaction, keeping the
+full prediction history queryable by sensor, forecast time, and horizon.
+
+Author: Satej
+"""
+
+import os
+import sqlite3
+from datetime import datetime, timezone
+
+import pandas as pd
+
+PREDICTION_COLUMNS = {
+    "ARIMA_Predictions": "ARIMA",
+    "LSTM_Predictions": "LSTM",
+}
+
+def _connect(db_path):
+    """
+    Open a connection to the prediction store.
+
+    Parameters:
+        db_path (str): Path to the SQLite database file.
+
+    Returns:
+        sqlite3.Connection: Open database connection.
+    """
+    conn = sqlite3.connect(db_path, timeout=30)
+    # WAL lets the dashboard read while the pipeline is writing
+    conn.execute("PRAGMA journal_mode=WAL")
+    return conn
+
+def _to_utc(values):
+    """
+    Convert timestamps to naive UTC. Naive values are assumed to be UTC already.
+
+    Parameters:
+        values (pd.Series, datetime or str): Timestamps to convert.
+
+    Returns:
+        pd.Series or pd.Timestamp: Naive UTC timestamps.
+    """
+    converted = pd.to_datetime(values, utc=True)
+    if isinstance(converted, pd.Series):
+        return converted.dt.tz_localize(None)
+    return converted.tz_localize(None)
+
+def _create_schema(conn):
+    """
+    Create the predictions table and its indexes if they do not exist yet.
+
+    Parameters:
+        conn (sqlite3.Connection): Open database connection.
+    """
+    # The primary key doubles as the (sensor_id, forecast_time, horizon) range index
+    with conn:
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS predictions (
+                sensor_id TEXT NOT NULL,
+                forecast_time TEXT NOT NULL,
+                horizon INTEGER NOT NULL,
+                model TEXT NOT NULL,
+                run_time TEXT NOT NULL,
+                prediction REAL,
+                PRIMARY KEY (sensor_id, forecast_time, horizon, model, run_time)
+            )
+            """
+        )
+        # Lets the latest run of a sensor be found with a single index seek
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_predictions_sensor_run "
+            "ON predictions (sensor_id, run_time)"
+        )
+
+def save_predictions(predictions_df, db_path, sensor_id, run_time=None, batch_size=5000):
+    """
+    Append a batch of predictions to the store as one atomic transaction.
+
+    Parameters:
+        predictions_df (pd.DataFrame): Predictions with a 'Timestamp' column and
+            one column per model (e.g., 'ARIMA_Predictions', 'LSTM_Predictions').
+            Row order gives the forecast horizon (first row is horizon 1).
+            Timezone-aware timestamps are converted to UTC; naive ones are
+            assumed to be UTC already.
+        db_path (str): Path to the SQLite database file.
+        sensor_id (str): Identifier of the sensor the predictions belong to.
+        run_time (datetime, optional): Time of the pipeline run. Naive values are
+            treated as local time. Defaults to now.
+        batch_size (int): Number of rows sent to the database per bulk insert.
+
+    Returns:
+        int: Number of prediction rows written.
+    """
+    if "Timestamp" not in predictions_df.columns:
+        raise ValueError("Predictions must contain a 'Timestamp' column.")
+    model_columns = [col for col in PREDICTION_COLUMNS if col in predictions_df.columns]
+    if not model_columns:
+        raise ValueError(f"Predictions must contain at least one of: {list(PREDICTION_COLUMNS)}")
+
+    # Stored as fixed-width naive UTC so MAX(run_time) orders runs correctly
+    run_time = pd.Timestamp(run_time or datetime.now(timezone.utc)).to_pydatetime().astimezone(timezone.utc)
+    run_time = run_time.replace(tzinfo=None).strftime("%Y-%m-%dT%H:%M:%S.%f")
+    forecast_times = _to_utc(predictions_df["Timestamp"]).dt.strftime("%Y-%m-%dT%H:%M:%S")
+
+    rows = []
+    for horizon, (forecast_time, (_, record)) in enumerate(
+        zip(forecast_times, predictions_df.iterrows()), start=1
+    ):
+        for col in model_columns:
+            value = record[col]
+            rows.append((
+                str(sensor_id),
+                forecast_time,
+                horizon,
+                PREDICTION_COLUMNS[col],
+                run_time,
+                None if pd.isna(value) else float(value),
+            ))
+
+    conn = _connect(db_path)
+    try:
+        _create_schema(conn)
+        # Single transaction: readers see either the whole run or none of it
+        with conn:
+            for start in range(0, len(rows), batch_size):
+                conn.executemany(
+                    "INSERT OR REPLACE INTO predictions "
+                    "(sensor_id, forecast_time, horizon, model, run_time, prediction) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    rows[start:start + batch_size],
+                )
+    except sqlite3.Error as e:
+        raise RuntimeError(f"Failed to save predictions to {db_path}: {str(e)}")
+    finally:
+        conn.close()
+
+    return len(rows)
+
+def load_predictions(db_path, sensor_id=None, start_time=None, end_time=None, horizon=None,
+                     latest_only=True, latest_run_only=False):
+    """
+    Query predictions from the store for a sensor and forecast time range.
+
+    Parameters:
+        db_path (str): Path to the SQLite database file.
+        sensor_id (str, optional): Restrict results to this sensor.
+        start_time (datetime or str, optional): Earliest forecast time (inclusive).
+            Timezone-aware values are converted to UTC.
+        end_time (datetime or str, optional): Latest forecast time (inclusive).
+            Timezone-aware values are converted to UTC.
+        horizon (int, optional): Restrict results to this forecast horizon.
+        latest_only (bool): Keep only the most recent run for each
+            (sensor, forecast time, horizon, model).
+        latest_run_only (bool): Keep only the rows written by the most recent
+            run of each sensor, then apply the other filters to them. Takes
+            precedence over latest_only.
+
+    Returns:
+        pd.DataFrame: Predictions in long format with columns 'sensor_id',
+        'forecast_time', 'horizon', 'model', 'run_time', and 'prediction'.
+        Times are naive UTC.
+    """
+    if not os.path.exists(db_path):
+        raise FileNotFoundError(f"The prediction store {db_path} does not exist.")
+
+    conditions = []
+    params = []
+    if sensor_id is not None:
+        conditions.append("sensor_id = ?")
+        params.append(str(sensor_id))
+    if start_time is not None:
+        conditions.append("forecast_time >= ?")
+        params.append(_to_utc(start_time).strftime("%Y-%m-%dT%H:%M:%S"))
+    if end_time is not None:
+        conditions.append("forecast_time <= ?")
+        params.append(_to_utc(end_time).strftime("%Y-%m-%dT%H:%M:%S"))
+    if horizon is not None:
+        conditions.append("horizon = ?")
+        params.append(int(horizon))
+
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    if latest_run_only:
+        if sensor_id is not None:
+            # A scalar MAX is a single seek on idx_predictions_sensor_run
+            latest = "SELECT ? AS sensor_id, (SELECT MAX(run_time) FROM predictions WHERE sensor_id = ?) AS run_time"
+            params = [str(sensor_id), str(sensor_id)] + params
+        else:
+            latest = "SELECT sensor_id, MAX(run_time) AS run_time FROM predictions GROUP BY sensor_id"
+        # CROSS JOIN keeps the latest runs as the outer loop, so only their rows are read
+        query = (
+            f"SELECT p.* FROM ({latest}) latest "
+            "CROSS JOIN predictions p USING (sensor_id, run_time) "
+            f"{where} "
+            "ORDER BY sensor_id, forecast_time, horizon, model"
+        )
+    elif latest_only:
+        query = (
+            "SELECT p.* FROM predictions p "
+            "JOIN (SELECT sensor_id, forecast_time, horizon, model, MAX(run_time) AS run_time "
+            f"FROM predictions {where} "
+            "GROUP BY sensor_id, forecast_time, horizon, model) latest "
+            "USING (sensor_id, forecast_time, horizon, model, run_time) "
+            "ORDER BY sensor_id, forecast_time, horizon, model"
+        )
+    else:
+        query = f"SELECT * FROM predictions {where} ORDER BY sensor_id, forecast_time, horizon, model, run_time"
+
+    conn = _connect(db_path)
+    try:
+        data = pd.read_sql_query(query, conn, params=params)
+    except Exception as e:
+        raise RuntimeError(f"Failed to load predictions from {db_path}: {str(e)}")
+    finally:
+        conn.close()
+
+    data["forecast_time"] = pd.to_datetime(data["forecast_time"])
+    data["run_time"] = pd.to_datetime(data["run_time"])
+    return data
+
+def to_wide_format(data):
+    """
+    Pivot long-format predictions into one row per forecast time.
+
+    Parameters:
+        data (pd.DataFrame): Predictions for a single run, as returned by
+            load_predictions(..., latest_run_only=True).
+
+    Returns:
+        pd.DataFrame: DataFrame with a 'Timestamp' column and one column per
+        model (e.g., 'ARIMA_Predictions', 'LSTM_Predictions').
+    """
+    wide = data.pivot_table(index="forecast_time", columns="model", values="prediction", aggfunc="last")
+    wide = wide.rename(columns=lambda model: f"{model}_Predictions")
+    # Always expose every model column so consumers can rely on them
+    wide = wide.reindex(columns=list(PREDICTION_COLUMNS))
+    wide.columns.name = None
+    return wide.rename_axis("Timestamp").reset_index()
+
+# Example usage
+if __name__ == "__main__":
+    import tempfile
+
+    db_path = os.path.join(tempfile.mkdtemp(), "predictions.db")  # e.g., "satej/data/predictions.db"
+
+    first_run = pd.DataFrame({
+        "Timestamp": pd.date_range("2024-01-01 08:00", periods=3, freq="h"),
+        "ARIMA_Predictions": [120.5, 130.2, 128.7],
+        "LSTM_Predictions": [118.9, 131.4, 127.3]
+    })
+    second_run = pd.DataFrame({
+        "Timestamp": pd.date_range("2024-01-01 09:00", periods=3, freq="h"),
+        "ARIMA_Predictions": [131.0, 129.5, 125.1],
+        "LSTM_Predictions": [132.2, 128.0, 124.6]
+    })
+    save_predictions(first_run, db_path, sensor_id="sensor_1", run_time=datetime(2024, 1, 1, 8, tzinfo=timezone.utc))
+    written = save_predictions(second_run, db_path, sensor_id="sensor_1", run_time=datetime(2024, 1, 1, 9, tzinfo=timezone.utc))
+    print(f"Saved {written} prediction rows to {db_path}")
+
+    # Only the second run's rows come back, across all of its horizons
+    latest_run = load_predictions(db_path, sensor_id="sensor_1", latest_run_only=True)
+    assert latest_run["run_time"].nunique() == 1
+    assert sorted(latest_run["horizon"].unique()) == [1, 2, 3]
+    assert latest_run["forecast_time"].min() == pd.Timestamp("2024-01-01 09:00")
+    print(latest_run)
+
+    # Wide format as used by the dashboard: one row per forecast time of the run
+    wide = to_wide_format(latest_run)
+    assert list(wide.columns) == ["Timestamp", "ARIMA_Predictions", "LSTM_Predictions"]
+    assert wide["ARIMA_Predictions"].tolist() == second_run["ARIMA_Predictions"].tolist()
+    print(wide)